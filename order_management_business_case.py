@@ -1,7 +1,9 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
-import plotly.express as px
+from collections import namedtuple
+from dataclasses import astuple, dataclass, fields
 from datetime import datetime
 import io
 
@@ -14,7 +16,7 @@ st.set_page_config(
 )
 
 # Custom CSS for better formatting
-st.markdown("""
+APP_CSS = """
     <style>
     .case-indicator {
         padding: 15px;
@@ -59,8 +61,23 @@ st.markdown("""
         border-left: 4px solid #17a2b8;
         margin: 15px 0;
     }
+    .breakdown-grid {
+        display: grid;
+        grid-template-columns: repeat(3, 1fr);
+        column-gap: 1rem;
+    }
+    .breakdown-value {
+        font-size: 2.25rem;
+        margin-bottom: 15px;
+    }
+    @media (max-width: 640px) {
+        .breakdown-grid {
+            grid-template-columns: 1fr;
+        }
+    }
     </style>
-""", unsafe_allow_html=True)
+"""
+st.markdown(APP_CSS, unsafe_allow_html=True)
 
 # Currency exchange rates (as of typical rates, update as needed)
 CURRENCY_RATES = {
@@ -99,6 +116,119 @@ CASE_SCENARIOS = {
     }
 }
 
+# Benefit categories as (display label, result key), in presentation order
+BENEFIT_CATEGORIES = (
+    ('Working Capital', 'working_capital'),
+    ('Error Reduction', 'error_reduction'),
+    ('Leakage Prevention', 'leakage_prevention'),
+    ('Labor Savings', 'labor_savings'),
+    ('Capacity Increase', 'capacity_increase')
+)
+
+# CSV export columns as (column name, result section, result key)
+EXPORT_COLUMNS = tuple(
+    [('Total Annual Benefit', 'benefits', 'total_annual')] +
+    [(label, 'benefits', key) for label, key in BENEFIT_CATEGORIES] +
+    [('Year 1 Investment', 'costs', 'year1'),
+     ('Recurring Cost', 'costs', 'recurring'),
+     ('3-Year NPV', 'metrics', 'npv'),
+     ('Payback Months', 'metrics', 'payback_months'),
+     ('3-Year ROI', 'metrics', 'roi_3year')]
+)
+
+# Cached results expire after a day so long-running sessions do not accumulate stale entries
+CACHE_TTL_SECONDS = 24 * 60 * 60
+
+# Case indicator banner markup, filled in for the selected case
+CASE_INDICATOR_TEMPLATE = """
+    <div class="case-indicator {case_class}">
+        {case_name}: {description}
+    </div>
+"""
+
+# Operational improvement rows as (label, current input field, target benefit key, value format, improvement format)
+OPERATIONAL_METRICS = (
+    ('DSO (Days)', 'current_dso', 'target_dso', '{:.0f}', '{:.0f} days'),
+    ('Error Rate (%)', 'current_error_rate', 'target_error_rate', '{:.1f}%', '{:.1f}%'),
+    ('Revenue Leakage (%)', 'current_leakage', 'target_leakage', '{:.1f}%', '{:.1f}%'),
+    ('Order-to-Cash Cycle (Days)', 'current_cycle_days', 'target_cycle_days', '{:.1f}', '{:.1f} days')
+)
+
+# Benefit breakdown cards as (heading, caption, result section, result key), laid out row by row
+BREAKDOWN_CARDS = (
+    ('💰 Working Capital', 'Cash freed from DSO reduction', 'benefits', 'working_capital'),
+    ('❌ Error Reduction', 'Eliminated rework costs', 'benefits', 'error_reduction'),
+    ('🔒 Leakage Prevention', 'Revenue protected', 'benefits', 'leakage_prevention'),
+    ('⚙️ Labor Savings', 'Automation efficiency gains', 'benefits', 'labor_savings'),
+    ('🚀 Capacity Increase', 'Revenue from faster cycles', 'benefits', 'capacity_increase'),
+    ('💵 Year 1 Investment', 'Total implementation cost', 'costs', 'year1')
+)
+BREAKDOWN_CARD_TEMPLATE = (
+    '<div><div class="insight-box"><strong>{heading}</strong><br>{caption}</div>'
+    '<div class="breakdown-value">{value}</div></div>'
+)
+
+# Static footer markup
+FOOTER_HTML = """
+<div style='text-align: center; color: #6c757d; font-size: 0.9em;'>
+<strong>Order Management AI Business Case</strong> | 
+Powered by Uniphore Business AI Cloud | 
+Built for CFO-grade financial analysis
+</div>
+"""
+
+# Case multipliers stacked across cases (Best, Base, Worst) so the formulas broadcast over the case axis
+CASE_NAMES = tuple(CASE_SCENARIOS)
+CASE_MULTIPLIER_ARRAYS = {
+    key: np.array([CASE_SCENARIOS[name][key] for name in CASE_NAMES])
+    for key in CASE_SCENARIOS['Base Case']
+    if key != 'description'
+}
+for _multiplier_array in CASE_MULTIPLIER_ARRAYS.values():
+    _multiplier_array.setflags(write=False)
+
+# Discount factors for the 3-year NPV (simplified, 8% discount rate)
+DISCOUNT_RATE = 0.08
+PROJECTION_YEARS = 3
+DISCOUNT_FACTORS = (1 + DISCOUNT_RATE) ** np.arange(1, PROJECTION_YEARS + 1)
+DISCOUNT_FACTORS.setflags(write=False)
+
+# Reciprocal discount factors and the year 1 selector let the ROI kernel discount with a single dot product
+PRESENT_VALUE_FACTORS = 1 / DISCOUNT_FACTORS
+PRESENT_VALUE_FACTORS.setflags(write=False)
+FIRST_YEAR_MASK = np.arange(PROJECTION_YEARS) == 0
+FIRST_YEAR_MASK.setflags(write=False)
+
+# Sensitivity sweep: variable name -> (input field, test values); platform cost values are percentage changes
+SENSITIVITY_VARIABLES = {
+    'DSO Improvement': ('current_dso', (5, 7.5, 10, 12.5, 15)),
+    'Error Reduction': ('current_error_rate', (4, 6, 8, 10, 12)),
+    'Leakage Prevention': ('current_leakage', (2, 3, 5, 6, 7)),
+    'Automation Rate': ('minutes_per_manual', (20, 24, 28, 32, 36)),
+    'Platform Cost': ('platform_annual_cost', (-20, -10, 0, 10, 20))
+}
+
+@dataclass(frozen=True, slots=True)
+class FinancialInputs:
+    """Business inputs from the sidebar; frozen so no step of a run can alter them"""
+    annual_orders: float
+    avg_order_value: float
+    current_dso: float
+    current_error_rate: float
+    current_leakage: float
+    cost_per_order: float
+    minutes_per_manual: float
+    hourly_cost: float
+    current_cycle_days: float
+    gross_margin: float
+    wacc: float
+    platform_annual_cost: float
+    implementation_cost: float
+    change_management: float
+
+# Cached functions taking FinancialInputs hash it by its field values
+INPUTS_HASH_FUNCS = {FinancialInputs: astuple}
+
 def format_number(value, decimals=0, prefix='', suffix=''):
     """Format numbers with commas and optional prefix/suffix"""
     if decimals == 0:
@@ -107,28 +237,58 @@ def format_number(value, decimals=0, prefix='', suffix=''):
         formatted = f"{value:,.{decimals}f}"
     return f"{prefix}{formatted}{suffix}"
 
+def format_html_amount(value, currency_symbol):
+    """Format an amount for HTML passed to st.markdown, escaping '$' so amounts are not read as math"""
+    return format_number(value, prefix=currency_symbol).replace('$', '&#36;')
+
 def convert_currency(amount, from_currency, to_currency):
     """Convert amount from one currency to another"""
     usd_amount = amount / CURRENCY_RATES[from_currency]
     return usd_amount * CURRENCY_RATES[to_currency]
 
-def calculate_benefits(inputs, case_multipliers, currency='USD'):
+def calculate_annual_revenue(inputs):
+    """Calculate annual revenue from order volume and average order value"""
+    return inputs.annual_orders * inputs.avg_order_value
+
+# Sensitivity batch with the FinancialInputs field names, one array column per input
+_InputBatch = namedtuple('_InputBatch', [field.name for field in fields(FinancialInputs)])
+
+# Current-state amounts that do not depend on the case scenario
+_CurrentState = namedtuple('_CurrentState', ['annual_revenue', 'current_ar', 'current_errors', 'current_leakage_amount'])
+
+def calculate_current_state(inputs, annual_revenue=None):
+    """Calculate the scenario-invariant current-state amounts shared by every case"""
+    
+    if annual_revenue is None:
+        annual_revenue = calculate_annual_revenue(inputs)
+    
+    return _CurrentState(
+        annual_revenue=annual_revenue,
+        current_ar=(inputs.current_dso / 365) * annual_revenue,
+        current_errors=inputs.annual_orders * (inputs.current_error_rate / 100),
+        current_leakage_amount=annual_revenue * (inputs.current_leakage / 100)
+    )
+
+def calculate_benefits(inputs, case_multipliers, currency='USD', current_state=None):
     """Calculate all financial benefits based on inputs and case scenario"""
     
     # Extract inputs
-    annual_orders = inputs['annual_orders']
-    avg_order_value = inputs['avg_order_value']
-    current_dso = inputs['current_dso']
-    current_error_rate = inputs['current_error_rate']
-    current_leakage = inputs['current_leakage']
-    cost_per_order = inputs['cost_per_order']
-    minutes_per_manual = inputs['minutes_per_manual']
-    hourly_cost = inputs['hourly_cost']
-    current_cycle_days = inputs['current_cycle_days']
-    gross_margin = inputs['gross_margin']
-    wacc = inputs['wacc']
-    
-    annual_revenue = annual_orders * avg_order_value
+    annual_orders = inputs.annual_orders
+    avg_order_value = inputs.avg_order_value
+    current_dso = inputs.current_dso
+    current_error_rate = inputs.current_error_rate
+    current_leakage = inputs.current_leakage
+    cost_per_order = inputs.cost_per_order
+    minutes_per_manual = inputs.minutes_per_manual
+    hourly_cost = inputs.hourly_cost
+    current_cycle_days = inputs.current_cycle_days
+    gross_margin = inputs.gross_margin
+    wacc = inputs.wacc
+    
+    # Only the targets vary by case; dispatchers pass the shared current state in precomputed
+    if current_state is None:
+        current_state = calculate_current_state(inputs)
+    annual_revenue = current_state.annual_revenue
     
     # Apply case multipliers to improvements
     target_dso = current_dso - (10 * case_multipliers['dso_improvement'])
@@ -141,19 +301,19 @@ def calculate_benefits(inputs, case_multipliers, currency='USD'):
     automation_improvement = base_automation_improvement * case_multipliers['automation_rate']
     
     # Benefit 1: Working Capital Improvement
-    current_ar = (current_dso / 365) * annual_revenue
+    current_ar = current_state.current_ar
     target_ar = (target_dso / 365) * annual_revenue
     cash_freed = current_ar - target_ar
     working_capital_benefit = cash_freed * (wacc / 100)
     
     # Benefit 2: Error Reduction
-    current_errors = annual_orders * (current_error_rate / 100)
+    current_errors = current_state.current_errors
     target_errors = annual_orders * (target_error_rate / 100)
     errors_eliminated = current_errors - target_errors
     error_reduction_benefit = errors_eliminated * cost_per_order
     
     # Benefit 3: Revenue Leakage Prevention
-    current_leakage_amount = annual_revenue * (current_leakage / 100)
+    current_leakage_amount = current_state.current_leakage_amount
     target_leakage_amount = annual_revenue * (target_leakage / 100)
     leakage_prevented = current_leakage_amount - target_leakage_amount
     leakage_benefit = leakage_prevented * (gross_margin / 100)
@@ -171,15 +331,16 @@ def calculate_benefits(inputs, case_multipliers, currency='USD'):
     total_annual_benefit = (working_capital_benefit + error_reduction_benefit + 
                            leakage_benefit + labor_benefit + capacity_benefit)
     
-    # Convert to selected currency
+    # Convert to selected currency with a single precomputed rate
     if currency != 'USD':
-        working_capital_benefit = convert_currency(working_capital_benefit, 'USD', currency)
-        error_reduction_benefit = convert_currency(error_reduction_benefit, 'USD', currency)
-        leakage_benefit = convert_currency(leakage_benefit, 'USD', currency)
-        labor_benefit = convert_currency(labor_benefit, 'USD', currency)
-        capacity_benefit = convert_currency(capacity_benefit, 'USD', currency)
-        total_annual_benefit = convert_currency(total_annual_benefit, 'USD', currency)
-        cash_freed = convert_currency(cash_freed, 'USD', currency)
+        fx_rate = convert_currency(1.0, 'USD', currency)
+        working_capital_benefit = working_capital_benefit * fx_rate
+        error_reduction_benefit = error_reduction_benefit * fx_rate
+        leakage_benefit = leakage_benefit * fx_rate
+        labor_benefit = labor_benefit * fx_rate
+        capacity_benefit = capacity_benefit * fx_rate
+        total_annual_benefit = total_annual_benefit * fx_rate
+        cash_freed = cash_freed * fx_rate
     
     return {
         'working_capital': working_capital_benefit,
@@ -199,108 +360,392 @@ def calculate_benefits(inputs, case_multipliers, currency='USD'):
 def calculate_investment(inputs, case_multipliers, currency='USD'):
     """Calculate total investment costs"""
     
-    platform_cost = inputs['platform_annual_cost'] * case_multipliers['cost_multiplier']
-    implementation_cost = inputs['implementation_cost'] * case_multipliers['cost_multiplier']
-    change_mgmt = inputs['change_management'] * case_multipliers['cost_multiplier']
+    platform_cost = inputs.platform_annual_cost * case_multipliers['cost_multiplier']
+    implementation_cost = inputs.implementation_cost * case_multipliers['cost_multiplier']
+    change_mgmt = inputs.change_management * case_multipliers['cost_multiplier']
     
     year1_cost = platform_cost + implementation_cost + change_mgmt
     recurring_cost = platform_cost
     
     if currency != 'USD':
-        year1_cost = convert_currency(year1_cost, 'USD', currency)
-        recurring_cost = convert_currency(recurring_cost, 'USD', currency)
+        fx_rate = convert_currency(1.0, 'USD', currency)
+        year1_cost = year1_cost * fx_rate
+        recurring_cost = recurring_cost * fx_rate
     
     return {
         'year1': year1_cost,
         'recurring': recurring_cost
     }
 
-def calculate_roi_metrics(benefits, costs, currency='USD'):
-    """Calculate ROI, payback, and NPV"""
+def _roi_kernel(annual_benefit, year1_cost, recurring_cost):
+    """Compute payback, NPV, ROI and 3-year net benefit from flat numbers or equally shaped arrays"""
     
-    annual_benefit = benefits['total_annual']
-    year1_cost = costs['year1']
-    recurring_cost = costs['recurring']
+    annual_benefit = np.asarray(annual_benefit, dtype=float)
+    year1_cost = np.asarray(year1_cost, dtype=float)
+    recurring_cost = np.asarray(recurring_cost, dtype=float)
     
-    # Simple payback period (months)
-    if annual_benefit > 0:
-        payback_months = (year1_cost / annual_benefit) * 12
-    else:
-        payback_months = float('inf')
-    
-    # 3-year NPV (simplified, 8% discount rate)
-    discount_rate = 0.08
-    year1_net = annual_benefit - year1_cost
-    year2_net = annual_benefit - recurring_cost
-    year3_net = annual_benefit - recurring_cost
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Simple payback period (months); NaN when there is no positive benefit to pay back
+        payback_months = np.where(annual_benefit > 0, (year1_cost / annual_benefit) * 12, np.nan)
+        
+        # ROI (Year 1)
+        roi = np.where(year1_cost > 0, ((annual_benefit - year1_cost) / year1_cost) * 100, 0.0)
     
-    npv = (year1_net / (1 + discount_rate)**1 + 
-           year2_net / (1 + discount_rate)**2 + 
-           year3_net / (1 + discount_rate)**3)
+    # Year-by-year costs broadcast over a trailing year axis: year 1 cost, then recurring cost
+    annual_costs = np.where(FIRST_YEAR_MASK, year1_cost[..., None], recurring_cost[..., None])
+    net_cash_flows = annual_benefit[..., None] - annual_costs
     
-    # ROI (Year 1)
-    if year1_cost > 0:
-        roi = ((annual_benefit - year1_cost) / year1_cost) * 100
-    else:
-        roi = 0
+    # 3-year NPV (simplified)
+    npv = net_cash_flows @ PRESENT_VALUE_FACTORS
     
     # 3-Year ROI
-    total_investment = year1_cost + recurring_cost * 2
-    total_benefits = annual_benefit * 3
-    roi_3year = ((total_benefits - total_investment) / total_investment) * 100
+    total_investment = annual_costs.sum(axis=-1)
+    total_benefits = annual_benefit * PROJECTION_YEARS
+    net_3year = total_benefits - total_investment
+    roi_3year = (net_3year / total_investment) * 100
     
-    return {
+    return payback_months, npv, roi, roi_3year, net_3year
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False, hash_funcs=INPUTS_HASH_FUNCS)
+def calculate_all_cases(inputs, currency='USD'):
+    """Calculate benefits, costs and ROI metrics for every case scenario"""
+    
+    # Stacked multipliers broadcast every formula across the case axis, so each step runs once
+    stacked_benefits = calculate_benefits(inputs, CASE_MULTIPLIER_ARRAYS, currency,
+                                          calculate_current_state(inputs))
+    stacked_costs = calculate_investment(inputs, CASE_MULTIPLIER_ARRAYS, currency)
+    payback_months, npv, roi, roi_3year, net_3year = _roi_kernel(
+        stacked_benefits['total_annual'], stacked_costs['year1'], stacked_costs['recurring']
+    )
+    stacked_metrics = {
         'payback_months': payback_months,
         'npv': npv,
         'roi_year1': roi,
-        'roi_3year': roi_3year
+        'roi_3year': roi_3year,
+        'net_3year': net_3year
     }
+    
+    # Slice the per-case results the UI expects out of the stacked arrays
+    all_cases_results = {}
+    for i, case_name in enumerate(CASE_NAMES):
+        all_cases_results[case_name] = {
+            section: {key: float(values[i]) for key, values in stacked.items()}
+            for section, stacked in (('benefits', stacked_benefits),
+                                     ('costs', stacked_costs),
+                                     ('metrics', stacked_metrics))
+        }
+    
+    return all_cases_results
+
+def calculate_projection(benefits, costs):
+    """Build the year-by-year cash flow projection used by the projection chart"""
+    
+    annual_benefits = np.full(PROJECTION_YEARS, benefits['total_annual'], dtype=float)
+    annual_costs = np.full(PROJECTION_YEARS, costs['recurring'], dtype=float)
+    annual_costs[0] = costs['year1']
+    
+    return pd.DataFrame({
+        'year': [f"Year {year}" for year in range(1, PROJECTION_YEARS + 1)],
+        'benefit': annual_benefits,
+        'cost': annual_costs,
+        'cumulative_net': np.cumsum(annual_benefits - annual_costs)
+    })
 
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False, hash_funcs=INPUTS_HASH_FUNCS)
 def perform_sensitivity_analysis(inputs, base_case_results, currency='USD'):
     """Perform sensitivity analysis on key variables"""
     
-    variables = {
-        'DSO Improvement': ('current_dso', [5, 7.5, 10, 12.5, 15]),
-        'Error Reduction': ('current_error_rate', [4, 6, 8, 10, 12]),
-        'Leakage Prevention': ('current_leakage', [2, 3, 5, 6, 7]),
-        'Automation Rate': ('minutes_per_manual', [20, 24, 28, 32, 36]),
-        'Platform Cost': ('platform_annual_cost', [-20, -10, 0, 10, 20])  # percentage change
+    base_roi = base_case_results['roi_3year']
+    base_multipliers = CASE_SCENARIOS['Base Case']
+    
+    # Row offsets of each variable's block of tests, from a prefix sum of the block sizes
+    block_ends = np.cumsum([len(test_values) for _, test_values in SENSITIVITY_VARIABLES.values()])
+    test_count = int(block_ends[-1])
+    
+    # None of the swept variables change volume or order value, so revenue is shared by every test
+    annual_revenue = calculate_annual_revenue(inputs)
+    
+    # Structure-of-arrays batch: one row per test, every input held as a contiguous column
+    columns = {
+        field.name: np.full(test_count, getattr(inputs, field.name), dtype=float)
+        for field in fields(inputs)
     }
     
-    sensitivity_results = []
-    base_roi = base_case_results['roi_3year']
+    # Row labels are built here so they are only formatted on a cache miss
+    variable_labels = []
+    value_labels = []
     
-    for var_name, (param_key, test_values) in variables.items():
-        impacts = []
+    for (var_name, (param_key, test_values)), block_end in zip(SENSITIVITY_VARIABLES.items(), block_ends):
+        test_array = np.asarray(test_values, dtype=float)
+        rows = slice(block_end - len(test_values), block_end)
         
-        for test_value in test_values:
-            test_inputs = inputs.copy()
-            
-            if param_key == 'platform_annual_cost':
-                # Handle percentage changes
-                test_inputs[param_key] = inputs[param_key] * (1 + test_value / 100)
-                label = f"{test_value:+.0f}%"
-            else:
-                test_inputs[param_key] = test_value
-                label = f"{test_value}"
-            
-            # Recalculate with modified input
-            test_benefits = calculate_benefits(test_inputs, CASE_SCENARIOS['Base Case'], currency)
-            test_costs = calculate_investment(test_inputs, CASE_SCENARIOS['Base Case'], currency)
-            test_metrics = calculate_roi_metrics(test_benefits, test_costs, currency)
-            
-            roi_change = test_metrics['roi_3year'] - base_roi
-            
-            impacts.append({
-                'variable': var_name,
-                'value': label,
-                'roi': test_metrics['roi_3year'],
-                'roi_change': roi_change
-            })
+        if param_key == 'platform_annual_cost':
+            # Handle percentage changes
+            columns[param_key][rows] = getattr(inputs, param_key) * (1 + test_array / 100)
+            value_labels.extend(f"{test_value:+.0f}%" for test_value in test_values)
+        else:
+            columns[param_key][rows] = test_array
+            value_labels.extend(f"{test_value}" for test_value in test_values)
         
-        sensitivity_results.extend(impacts)
+        variable_labels.extend([var_name] * len(test_values))
+    
+    batch_inputs = _InputBatch(**columns)
+    
+    # Recalculate every test in a single pass over the batch
+    current_state = calculate_current_state(batch_inputs, annual_revenue)
+    test_benefits = calculate_benefits(batch_inputs, base_multipliers, currency, current_state)
+    test_costs = calculate_investment(batch_inputs, base_multipliers, currency)
+    _, _, _, test_roi, _ = _roi_kernel(test_benefits['total_annual'], test_costs['year1'], test_costs['recurring'])
+    
+    return pd.DataFrame({
+        'variable': pd.Categorical(variable_labels, categories=list(SENSITIVITY_VARIABLES), ordered=True),
+        'value': value_labels,
+        'roi': test_roi,
+        'roi_change': test_roi - base_roi
+    })
+
+def create_waterfall_chart(benefit_amounts, total_annual, selected_case, currency_symbol):
+    """Create the annual benefit waterfall chart from amounts in BENEFIT_CATEGORIES order"""
+    
+    waterfall_data = {
+        'Category': [label for label, _ in BENEFIT_CATEGORIES] + ['Total'],
+        'Amount': list(benefit_amounts) + [total_annual],
+        'Type': ['relative'] * len(BENEFIT_CATEGORIES) + ['total']
+    }
+    
+    fig = go.Figure(go.Waterfall(
+        x=waterfall_data['Category'],
+        y=waterfall_data['Amount'],
+        measure=waterfall_data['Type'],
+        text=[format_number(v, prefix=currency_symbol) for v in waterfall_data['Amount']],
+        textposition="outside",
+        connector={"line": {"color": "rgb(63, 63, 63)"}},
+        increasing={"marker": {"color": "#28a745"}},
+        totals={"marker": {"color": "#007bff"}}
+    ))
+    
+    fig.update_layout(
+        title=f"Annual Benefit Breakdown - {selected_case}",
+        showlegend=False,
+        height=500,
+        yaxis_title=f"Benefit Amount ({currency_symbol})"
+    )
+    
+    return fig
+
+def create_projection_chart(years, annual_benefits, annual_costs, cumulative_net,
+                            selected_case, currency_symbol):
+    """Create the multi-year benefit, cost and cumulative net projection chart"""
+    
+    fig = go.Figure(data=[
+        go.Bar(
+            name='Annual Benefit',
+            x=years,
+            y=annual_benefits,
+            marker_color='#28a745',
+            text=[format_number(v, prefix=currency_symbol) for v in annual_benefits],
+            textposition='outside'
+        ),
+        go.Bar(
+            name='Annual Cost',
+            x=years,
+            y=-annual_costs,
+            marker_color='#dc3545',
+            text=[format_number(v, prefix=currency_symbol) for v in annual_costs],
+            textposition='outside'
+        ),
+        go.Scatter(
+            name='Cumulative Net Benefit',
+            x=years,
+            y=cumulative_net,
+            mode='lines+markers+text',
+            line=dict(color='#007bff', width=3),
+            marker=dict(size=10),
+            text=[format_number(v, prefix=currency_symbol) for v in cumulative_net],
+            textposition='top center',
+            fill='tozeroy',
+            fillcolor='rgba(0, 123, 255, 0.1)'
+        )
+    ])
+    
+    fig.update_layout(
+        title=f"3-Year Financial Projection - {selected_case}",
+        barmode='relative',
+        height=500,
+        yaxis_title=f"Amount ({currency_symbol})",
+        hovermode='x unified',
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    
+    return fig
+
+def create_scenario_chart(scenario_names, scenario_net, scenario_roi, currency_symbol):
+    """Create the net benefit and ROI comparison chart across scenarios"""
+    
+    fig = go.Figure(data=[
+        go.Bar(
+            name='3-Year Net Benefit',
+            x=scenario_names,
+            y=scenario_net,
+            marker_color=['#28a745', '#17a2b8', '#ffc107'],
+            text=[format_number(v, prefix=currency_symbol) for v in scenario_net],
+            textposition='outside',
+            yaxis='y'
+        ),
+        go.Scatter(
+            name='3-Year ROI',
+            x=scenario_names,
+            y=scenario_roi,
+            mode='lines+markers+text',
+            line=dict(color='#dc3545', width=3),
+            marker=dict(size=12),
+            text=[f"{v:.1f}%" for v in scenario_roi],
+            textposition='top center',
+            yaxis='y2'
+        )
+    ])
+    
+    fig.update_layout(
+        title="Financial Outcomes Across Scenarios",
+        height=500,
+        yaxis=dict(title=f"3-Year Net Benefit ({currency_symbol})"),
+        yaxis2=dict(title="3-Year ROI (%)", overlaying='y', side='right'),
+        hovermode='x unified',
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    
+    return fig
+
+def create_tornado_chart(variables, min_impacts, max_impacts):
+    """Create the ROI sensitivity tornado chart"""
+    
+    fig = go.Figure(data=[
+        go.Bar(
+            name='Negative Impact',
+            y=variables,
+            x=min_impacts,
+            orientation='h',
+            marker_color='#dc3545',
+            text=[f"{v:.1f}%" for v in min_impacts],
+            textposition='outside'
+        ),
+        go.Bar(
+            name='Positive Impact',
+            y=variables,
+            x=max_impacts,
+            orientation='h',
+            marker_color='#28a745',
+            text=[f"{v:+.1f}%" for v in max_impacts],
+            textposition='outside'
+        )
+    ])
+    
+    fig.update_layout(
+        title="ROI Sensitivity to Key Variables (Base Case)",
+        barmode='overlay',
+        height=400,
+        xaxis_title="Impact on 3-Year ROI (percentage points)",
+        yaxis_title="Variable",
+        showlegend=True,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    
+    return fig
+
+def build_export_frame(all_cases_results, currency):
+    """Assemble the all-scenario export table column by column with explicit dtypes"""
     
-    return pd.DataFrame(sensitivity_results)
+    export_data = {'Scenario': np.array(CASE_NAMES, dtype=object)}
+    for column, section, key in EXPORT_COLUMNS:
+        export_data[column] = np.array(
+            [all_cases_results[case_name][section][key] for case_name in CASE_NAMES], dtype=np.float64
+        )
+    export_data['Currency'] = np.full(len(CASE_NAMES), currency, dtype=object)
+    
+    return pd.DataFrame(export_data)
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def build_export_csv(all_cases_results, currency):
+    """Serialize the all-scenario export table once per set of results"""
+    
+    return build_export_frame(all_cases_results, currency).to_csv(index=False)
+
+def today_token():
+    """Date stamp used in download file names"""
+    
+    return datetime.now().strftime('%Y%m%d')
+
+# Executive summary layout; the timestamped header is kept apart so the cached body
+# does not change every minute
+EXEC_SUMMARY_HEADER = """
+ORDER MANAGEMENT AI - EXECUTIVE SUMMARY
+Generated: {generated_at}
+"""
+EXEC_SUMMARY_TEMPLATE = """Currency: {currency}
+Selected Scenario: {selected_case}
+
+KEY FINANCIAL METRICS
+Total Annual Benefit: {total_annual}
+3-Year NPV: {npv}
+Payback Period: {payback_period}
+3-Year ROI: {roi_3year:.1f}%
+
+BENEFIT BREAKDOWN
+Working Capital: {working_capital}
+Error Reduction: {error_reduction}
+Leakage Prevention: {leakage_prevention}
+Labor Savings: {labor_savings}
+Capacity Increase: {capacity_increase}
+
+INVESTMENT REQUIRED
+Year 1: {year1_cost}
+Recurring (Years 2-3): {recurring_cost}
+
+OPERATIONAL IMPROVEMENTS
+DSO: {current_dso:.0f} → {target_dso:.0f} days
+Error Rate: {current_error_rate:.1f}% → {target_error_rate:.1f}%
+Revenue Leakage: {current_leakage:.1f}% → {target_leakage:.1f}%
+Order Cycle: {current_cycle_days:.1f} → {target_cycle_days:.1f} days
+Automation Increase: +{automation_improvement:.0f}%
+
+SCENARIO COMPARISON
+Best Case 3-Year ROI: {best_roi_3year:.1f}%
+Base Case 3-Year ROI: {base_roi_3year:.1f}%
+Worst Case 3-Year ROI: {worst_roi_3year:.1f}%
+"""
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False, hash_funcs=INPUTS_HASH_FUNCS)
+def generate_executive_summary(currency, currency_symbol, selected_case,
+                               inputs, benefits, costs, roi_metrics, payback_period, all_cases_results):
+    """Fill the executive summary template for the selected scenario, without the timestamped header"""
+    
+    return EXEC_SUMMARY_TEMPLATE.format(
+        currency=currency,
+        selected_case=selected_case,
+        total_annual=format_number(benefits['total_annual'], prefix=currency_symbol),
+        npv=format_number(roi_metrics['npv'], prefix=currency_symbol),
+        payback_period=payback_period,
+        roi_3year=roi_metrics['roi_3year'],
+        working_capital=format_number(benefits['working_capital'], prefix=currency_symbol),
+        error_reduction=format_number(benefits['error_reduction'], prefix=currency_symbol),
+        leakage_prevention=format_number(benefits['leakage_prevention'], prefix=currency_symbol),
+        labor_savings=format_number(benefits['labor_savings'], prefix=currency_symbol),
+        capacity_increase=format_number(benefits['capacity_increase'], prefix=currency_symbol),
+        year1_cost=format_number(costs['year1'], prefix=currency_symbol),
+        recurring_cost=format_number(costs['recurring'], prefix=currency_symbol),
+        current_dso=inputs.current_dso,
+        target_dso=benefits['target_dso'],
+        current_error_rate=inputs.current_error_rate,
+        target_error_rate=benefits['target_error_rate'],
+        current_leakage=inputs.current_leakage,
+        target_leakage=benefits['target_leakage'],
+        current_cycle_days=inputs.current_cycle_days,
+        target_cycle_days=benefits['target_cycle_days'],
+        automation_improvement=benefits['automation_improvement'],
+        best_roi_3year=all_cases_results['Best Case']['metrics']['roi_3year'],
+        base_roi_3year=all_cases_results['Base Case']['metrics']['roi_3year'],
+        worst_roi_3year=all_cases_results['Worst Case']['metrics']['roi_3year']
+    )
 
 # Initialize session state for currency
 if 'currency' not in st.session_state:
@@ -453,22 +898,22 @@ with st.sidebar:
     )
 
 # Compile inputs
-inputs = {
-    'annual_orders': annual_orders,
-    'avg_order_value': avg_order_value,
-    'current_dso': current_dso,
-    'current_error_rate': current_error_rate,
-    'current_leakage': current_leakage,
-    'cost_per_order': cost_per_order,
-    'minutes_per_manual': minutes_per_manual,
-    'hourly_cost': hourly_cost,
-    'current_cycle_days': current_cycle_days,
-    'gross_margin': gross_margin,
-    'wacc': wacc,
-    'platform_annual_cost': platform_annual_cost,
-    'implementation_cost': implementation_cost,
-    'change_management': change_management
-}
+inputs = FinancialInputs(
+    annual_orders=annual_orders,
+    avg_order_value=avg_order_value,
+    current_dso=current_dso,
+    current_error_rate=current_error_rate,
+    current_leakage=current_leakage,
+    cost_per_order=cost_per_order,
+    minutes_per_manual=minutes_per_manual,
+    hourly_cost=hourly_cost,
+    current_cycle_days=current_cycle_days,
+    gross_margin=gross_margin,
+    wacc=wacc,
+    platform_annual_cost=platform_annual_cost,
+    implementation_cost=implementation_cost,
+    change_management=change_management
+)
 
 # Main content
 st.title("🎯 Order Management AI - Financial Business Case")
@@ -484,31 +929,27 @@ selected_case = st.radio(
 )
 
 # Display case indicator with color
-case_class = selected_case.lower().replace(' ', '-')
-st.markdown(f"""
-    <div class="case-indicator {case_class}">
-        {selected_case}: {CASE_SCENARIOS[selected_case]['description']}
-    </div>
-""", unsafe_allow_html=True)
+st.markdown(CASE_INDICATOR_TEMPLATE.format(
+    case_class=selected_case.lower().replace(' ', '-'),
+    case_name=selected_case,
+    description=CASE_SCENARIOS[selected_case]['description']
+), unsafe_allow_html=True)
 
-# Calculate results for selected case
+# Calculate all three cases for comparison
+all_cases_results = calculate_all_cases(inputs, currency)
+
+# Results for selected case
 case_multipliers = CASE_SCENARIOS[selected_case]
-benefits = calculate_benefits(inputs, case_multipliers, currency)
-costs = calculate_investment(inputs, case_multipliers, currency)
-roi_metrics = calculate_roi_metrics(benefits, costs, currency)
+benefits = all_cases_results[selected_case]['benefits']
+costs = all_cases_results[selected_case]['costs']
+roi_metrics = all_cases_results[selected_case]['metrics']
 
-# Calculate all three cases for comparison
-all_cases_results = {}
-for case_name in ['Best Case', 'Base Case', 'Worst Case']:
-    case_mult = CASE_SCENARIOS[case_name]
-    case_benefits = calculate_benefits(inputs, case_mult, currency)
-    case_costs = calculate_investment(inputs, case_mult, currency)
-    case_metrics = calculate_roi_metrics(case_benefits, case_costs, currency)
-    all_cases_results[case_name] = {
-        'benefits': case_benefits,
-        'costs': case_costs,
-        'metrics': case_metrics
-    }
+# Payback labels for every case, formatted once; NaN means the case never pays back
+paybacks = np.array([all_cases_results[case_name]['metrics']['payback_months'] for case_name in CASE_NAMES])
+payback_values = np.char.mod('%.1f', paybacks)
+has_payback = ~np.isnan(paybacks)
+payback_value = dict(zip(CASE_NAMES, np.where(has_payback, payback_values, "N/A").tolist()))
+payback_period = dict(zip(CASE_NAMES, np.where(has_payback, np.char.add(payback_values, " months"), "N/A").tolist()))
 
 # Key Financial Metrics
 st.markdown("## 💎 Key Financial Metrics")
@@ -532,7 +973,7 @@ with col2:
 with col3:
     st.metric(
         "Payback Period",
-        f"{roi_metrics['payback_months']:.1f} months",
+        payback_period[selected_case],
         delta=None
     )
 
@@ -546,68 +987,23 @@ with col4:
 # Benefit Breakdown
 st.markdown("## 📊 Annual Benefit Breakdown")
 
-col1, col2, col3 = st.columns(3)
-
-with col1:
-    st.markdown("""
-        <div class="insight-box">
-        <strong>💰 Working Capital</strong><br>
-        Cash freed from DSO reduction
-        </div>
-    """, unsafe_allow_html=True)
-    st.metric("", format_number(benefits['working_capital'], prefix=currency_symbol))
-
-with col2:
-    st.markdown("""
-        <div class="insight-box">
-        <strong>❌ Error Reduction</strong><br>
-        Eliminated rework costs
-        </div>
-    """, unsafe_allow_html=True)
-    st.metric("", format_number(benefits['error_reduction'], prefix=currency_symbol))
-
-with col3:
-    st.markdown("""
-        <div class="insight-box">
-        <strong>🔒 Leakage Prevention</strong><br>
-        Revenue protected
-        </div>
-    """, unsafe_allow_html=True)
-    st.metric("", format_number(benefits['leakage_prevention'], prefix=currency_symbol))
-
-col1, col2, col3 = st.columns(3)
-
-with col1:
-    st.markdown("""
-        <div class="insight-box">
-        <strong>⚙️ Labor Savings</strong><br>
-        Automation efficiency gains
-        </div>
-    """, unsafe_allow_html=True)
-    st.metric("", format_number(benefits['labor_savings'], prefix=currency_symbol))
-
-with col2:
-    st.markdown("""
-        <div class="insight-box">
-        <strong>🚀 Capacity Increase</strong><br>
-        Revenue from faster cycles
-        </div>
-    """, unsafe_allow_html=True)
-    st.metric("", format_number(benefits['capacity_increase'], prefix=currency_symbol))
-
-with col3:
-    st.markdown("""
-        <div class="insight-box">
-        <strong>💵 Year 1 Investment</strong><br>
-        Total implementation cost
-        </div>
-    """, unsafe_allow_html=True)
-    st.metric("", format_number(costs['year1'], prefix=currency_symbol))
+# All six cards go out as one HTML grid rather than a column, markdown and metric widget per card
+case_sections = {'benefits': benefits, 'costs': costs}
+st.markdown(
+    '<div class="breakdown-grid">' + ''.join(
+        BREAKDOWN_CARD_TEMPLATE.format(
+            heading=heading,
+            caption=caption,
+            value=format_html_amount(case_sections[section][key], currency_symbol)
+        )
+        for heading, caption, section, key in BREAKDOWN_CARDS
+    ) + '</div>',
+    unsafe_allow_html=True
+)
 
 # Financial Analysis Section
-st.markdown('<h2 class="section-header">📈 Financial Analysis</h2>', unsafe_allow_html=True)
-
 st.markdown("""
+<h2 class="section-header">📈 Financial Analysis</h2>
 <div class="insight-box">
 <strong>Understanding the Financial Analysis</strong><br>
 This section provides detailed visualizations of your financial returns across multiple dimensions.
@@ -616,150 +1012,59 @@ Each chart is designed to answer specific executive questions about value creati
 """, unsafe_allow_html=True)
 
 # Benefit Waterfall Chart
-st.markdown("### 💧 Value Creation Waterfall")
 st.markdown("""
+### 💧 Value Creation Waterfall
+
 **What this shows:** The waterfall chart breaks down how each operational improvement contributes to your total annual benefit.
 This visualization helps identify which value drivers are most significant and where to focus implementation efforts.
 """)
 
-waterfall_data = {
-    'Category': ['Working Capital', 'Error Reduction', 'Leakage Prevention', 
-                'Labor Savings', 'Capacity Increase', 'Total'],
-    'Amount': [benefits['working_capital'], benefits['error_reduction'], 
-               benefits['leakage_prevention'], benefits['labor_savings'],
-               benefits['capacity_increase'], benefits['total_annual']],
-    'Type': ['relative', 'relative', 'relative', 'relative', 'relative', 'total']
-}
-
-fig_waterfall = go.Figure(go.Waterfall(
-    x=waterfall_data['Category'],
-    y=waterfall_data['Amount'],
-    measure=waterfall_data['Type'],
-    text=[format_number(v, prefix=currency_symbol) for v in waterfall_data['Amount']],
-    textposition="outside",
-    connector={"line": {"color": "rgb(63, 63, 63)"}},
-    increasing={"marker": {"color": "#28a745"}},
-    totals={"marker": {"color": "#007bff"}}
-))
-
-fig_waterfall.update_layout(
-    title=f"Annual Benefit Breakdown - {selected_case}",
-    showlegend=False,
-    height=500,
-    yaxis_title=f"Benefit Amount ({currency_symbol})"
+# Charts take primitive inputs (tuples and arrays) rather than result dicts or DataFrames
+fig_waterfall = create_waterfall_chart(
+    tuple(benefits[key] for _, key in BENEFIT_CATEGORIES), benefits['total_annual'],
+    selected_case, currency_symbol
 )
 
 st.plotly_chart(fig_waterfall, use_container_width=True)
 
 # Three-year projection
-st.markdown("### 📅 3-Year Financial Projection")
 st.markdown("""
+### 📅 3-Year Financial Projection
+
 **What this shows:** This projection illustrates cumulative financial impact over three years, showing when the investment
 breaks even and how benefits compound over time. The shaded area represents your net cumulative benefit.
 """)
 
-years = ['Year 1', 'Year 2', 'Year 3']
-annual_benefits = [benefits['total_annual']] * 3
-annual_costs = [costs['year1'], costs['recurring'], costs['recurring']]
-net_benefits = [b - c for b, c in zip(annual_benefits, annual_costs)]
-cumulative_net = [sum(net_benefits[:i+1]) for i in range(3)]
-
-fig_projection = go.Figure()
-
-fig_projection.add_trace(go.Bar(
-    name='Annual Benefit',
-    x=years,
-    y=annual_benefits,
-    marker_color='#28a745',
-    text=[format_number(v, prefix=currency_symbol) for v in annual_benefits],
-    textposition='outside'
-))
-
-fig_projection.add_trace(go.Bar(
-    name='Annual Cost',
-    x=years,
-    y=[-c for c in annual_costs],
-    marker_color='#dc3545',
-    text=[format_number(v, prefix=currency_symbol) for v in annual_costs],
-    textposition='outside'
-))
-
-fig_projection.add_trace(go.Scatter(
-    name='Cumulative Net Benefit',
-    x=years,
-    y=cumulative_net,
-    mode='lines+markers+text',
-    line=dict(color='#007bff', width=3),
-    marker=dict(size=10),
-    text=[format_number(v, prefix=currency_symbol) for v in cumulative_net],
-    textposition='top center',
-    fill='tozeroy',
-    fillcolor='rgba(0, 123, 255, 0.1)'
-))
-
-fig_projection.update_layout(
-    title=f"3-Year Financial Projection - {selected_case}",
-    barmode='relative',
-    height=500,
-    yaxis_title=f"Amount ({currency_symbol})",
-    hovermode='x unified',
-    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+projection_df = calculate_projection(benefits, costs)
+fig_projection = create_projection_chart(
+    tuple(projection_df['year']),
+    projection_df['benefit'].to_numpy(),
+    projection_df['cost'].to_numpy(),
+    projection_df['cumulative_net'].to_numpy(),
+    selected_case, currency_symbol
 )
 
 st.plotly_chart(fig_projection, use_container_width=True)
 
 # Scenario Comparison Chart
-st.markdown("### 🎲 Scenario Comparison Analysis")
 st.markdown("""
+### 🎲 Scenario Comparison Analysis
+
 **What this shows:** Compare financial outcomes across Best, Base, and Worst case scenarios. This helps quantify
 the range of potential outcomes and supports risk-adjusted decision making. The bars show total 3-year benefits minus costs.
 """)
 
-scenario_names = list(all_cases_results.keys())
-scenario_benefits = [all_cases_results[case]['benefits']['total_annual'] * 3 for case in scenario_names]
-scenario_costs = [all_cases_results[case]['costs']['year1'] + all_cases_results[case]['costs']['recurring'] * 2 
-                  for case in scenario_names]
-scenario_net = [b - c for b, c in zip(scenario_benefits, scenario_costs)]
-scenario_roi = [all_cases_results[case]['metrics']['roi_3year'] for case in scenario_names]
-
-fig_scenarios = go.Figure()
-
-fig_scenarios.add_trace(go.Bar(
-    name='3-Year Net Benefit',
-    x=scenario_names,
-    y=scenario_net,
-    marker_color=['#28a745', '#17a2b8', '#ffc107'],
-    text=[format_number(v, prefix=currency_symbol) for v in scenario_net],
-    textposition='outside',
-    yaxis='y'
-))
-
-fig_scenarios.add_trace(go.Scatter(
-    name='3-Year ROI',
-    x=scenario_names,
-    y=scenario_roi,
-    mode='lines+markers+text',
-    line=dict(color='#dc3545', width=3),
-    marker=dict(size=12),
-    text=[f"{v:.1f}%" for v in scenario_roi],
-    textposition='top center',
-    yaxis='y2'
-))
-
-fig_scenarios.update_layout(
-    title="Financial Outcomes Across Scenarios",
-    height=500,
-    yaxis=dict(title=f"3-Year Net Benefit ({currency_symbol})"),
-    yaxis2=dict(title="3-Year ROI (%)", overlaying='y', side='right'),
-    hovermode='x unified',
-    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-)
+scenario_net = tuple(all_cases_results[case]['metrics']['net_3year'] for case in CASE_NAMES)
+scenario_roi = tuple(all_cases_results[case]['metrics']['roi_3year'] for case in CASE_NAMES)
+
+fig_scenarios = create_scenario_chart(CASE_NAMES, scenario_net, scenario_roi, currency_symbol)
 
 st.plotly_chart(fig_scenarios, use_container_width=True)
 
 # Sensitivity Analysis
-st.markdown("### 🎯 Sensitivity Analysis")
 st.markdown("""
+### 🎯 Sensitivity Analysis
+
 **What this shows:** This tornado chart ranks variables by their impact on ROI. The longest bars represent the most
 sensitive assumptions—these are the variables that require the most careful validation and monitoring during implementation.
 The chart helps prioritize due diligence efforts and identify potential risks.
@@ -769,121 +1074,58 @@ The chart helps prioritize due diligence efforts and identify potential risks.
 sensitivity_df = perform_sensitivity_analysis(inputs, all_cases_results['Base Case']['metrics'], currency)
 
 # Create tornado chart - show impact range for each variable
-tornado_data = []
-for var in sensitivity_df['variable'].unique():
-    var_data = sensitivity_df[sensitivity_df['variable'] == var]
-    max_impact = var_data['roi_change'].max()
-    min_impact = var_data['roi_change'].min()
-    range_impact = max_impact - min_impact
-    tornado_data.append({
-        'variable': var,
-        'min_impact': min_impact,
-        'max_impact': max_impact,
-        'range': range_impact
-    })
-
-tornado_df = pd.DataFrame(tornado_data).sort_values('range', ascending=True)
-
-fig_tornado = go.Figure()
-
-fig_tornado.add_trace(go.Bar(
-    name='Negative Impact',
-    y=tornado_df['variable'],
-    x=tornado_df['min_impact'],
-    orientation='h',
-    marker_color='#dc3545',
-    text=[f"{v:.1f}%" for v in tornado_df['min_impact']],
-    textposition='outside'
-))
-
-fig_tornado.add_trace(go.Bar(
-    name='Positive Impact',
-    y=tornado_df['variable'],
-    x=tornado_df['max_impact'],
-    orientation='h',
-    marker_color='#28a745',
-    text=[f"{v:+.1f}%" for v in tornado_df['max_impact']],
-    textposition='outside'
-))
-
-fig_tornado.update_layout(
-    title="ROI Sensitivity to Key Variables (Base Case)",
-    barmode='overlay',
-    height=400,
-    xaxis_title="Impact on 3-Year ROI (percentage points)",
-    yaxis_title="Variable",
-    showlegend=True,
-    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+tornado_df = sensitivity_df.groupby('variable', observed=True).agg(
+    min_impact=('roi_change', 'min'),
+    max_impact=('roi_change', 'max')
+).reset_index()
+tornado_df['range'] = tornado_df['max_impact'] - tornado_df['min_impact']
+# Equal ranges fall back to the sweep's declared variable order, via the ordered categorical
+tornado_df = tornado_df.sort_values(['range', 'variable'], ascending=True)
+
+fig_tornado = create_tornado_chart(
+    tuple(tornado_df['variable'].astype(str)),
+    tornado_df['min_impact'].to_numpy(),
+    tornado_df['max_impact'].to_numpy()
 )
 
 st.plotly_chart(fig_tornado, use_container_width=True)
 
 # Financial Analysis Tables
-st.markdown('<h3 class="section-header">📋 Detailed Financial Tables</h3>', unsafe_allow_html=True)
-
 st.markdown("""
+<h3 class="section-header">📋 Detailed Financial Tables</h3>
+
 **What these tables show:** Comprehensive financial details supporting the visualizations above. 
 These tables provide the specific numbers executives need for budget approvals and board presentations.
-""")
+""", unsafe_allow_html=True)
 
 # Three scenario comparison table
 col1, col2 = st.columns(2)
 
 with col1:
     st.markdown("#### 💰 Benefits by Scenario")
+    benefit_rows = BENEFIT_CATEGORIES + (('Total Annual', 'total_annual'),)
     benefits_comparison = pd.DataFrame({
-        'Benefit Category': ['Working Capital', 'Error Reduction', 'Leakage Prevention', 
-                            'Labor Savings', 'Capacity Increase', 'Total Annual'],
-        'Best Case': [
-            format_number(all_cases_results['Best Case']['benefits']['working_capital'], prefix=currency_symbol),
-            format_number(all_cases_results['Best Case']['benefits']['error_reduction'], prefix=currency_symbol),
-            format_number(all_cases_results['Best Case']['benefits']['leakage_prevention'], prefix=currency_symbol),
-            format_number(all_cases_results['Best Case']['benefits']['labor_savings'], prefix=currency_symbol),
-            format_number(all_cases_results['Best Case']['benefits']['capacity_increase'], prefix=currency_symbol),
-            format_number(all_cases_results['Best Case']['benefits']['total_annual'], prefix=currency_symbol)
-        ],
-        'Base Case': [
-            format_number(all_cases_results['Base Case']['benefits']['working_capital'], prefix=currency_symbol),
-            format_number(all_cases_results['Base Case']['benefits']['error_reduction'], prefix=currency_symbol),
-            format_number(all_cases_results['Base Case']['benefits']['leakage_prevention'], prefix=currency_symbol),
-            format_number(all_cases_results['Base Case']['benefits']['labor_savings'], prefix=currency_symbol),
-            format_number(all_cases_results['Base Case']['benefits']['capacity_increase'], prefix=currency_symbol),
-            format_number(all_cases_results['Base Case']['benefits']['total_annual'], prefix=currency_symbol)
-        ],
-        'Worst Case': [
-            format_number(all_cases_results['Worst Case']['benefits']['working_capital'], prefix=currency_symbol),
-            format_number(all_cases_results['Worst Case']['benefits']['error_reduction'], prefix=currency_symbol),
-            format_number(all_cases_results['Worst Case']['benefits']['leakage_prevention'], prefix=currency_symbol),
-            format_number(all_cases_results['Worst Case']['benefits']['labor_savings'], prefix=currency_symbol),
-            format_number(all_cases_results['Worst Case']['benefits']['capacity_increase'], prefix=currency_symbol),
-            format_number(all_cases_results['Worst Case']['benefits']['total_annual'], prefix=currency_symbol)
-        ]
+        'Benefit Category': [label for label, _ in benefit_rows],
+        **{
+            case_name: [format_number(all_cases_results[case_name]['benefits'][key], prefix=currency_symbol)
+                        for _, key in benefit_rows]
+            for case_name in CASE_NAMES
+        }
     })
     st.dataframe(benefits_comparison, use_container_width=True, hide_index=True)
 
 with col2:
     st.markdown("#### 📊 ROI Metrics by Scenario")
-    roi_comparison = pd.DataFrame({
-        'Metric': ['3-Year NPV', 'Payback (months)', 'Year 1 ROI', '3-Year ROI'],
-        'Best Case': [
-            format_number(all_cases_results['Best Case']['metrics']['npv'], prefix=currency_symbol),
-            f"{all_cases_results['Best Case']['metrics']['payback_months']:.1f}",
-            f"{all_cases_results['Best Case']['metrics']['roi_year1']:.1f}%",
-            f"{all_cases_results['Best Case']['metrics']['roi_3year']:.1f}%"
-        ],
-        'Base Case': [
-            format_number(all_cases_results['Base Case']['metrics']['npv'], prefix=currency_symbol),
-            f"{all_cases_results['Base Case']['metrics']['payback_months']:.1f}",
-            f"{all_cases_results['Base Case']['metrics']['roi_year1']:.1f}%",
-            f"{all_cases_results['Base Case']['metrics']['roi_3year']:.1f}%"
-        ],
-        'Worst Case': [
-            format_number(all_cases_results['Worst Case']['metrics']['npv'], prefix=currency_symbol),
-            f"{all_cases_results['Worst Case']['metrics']['payback_months']:.1f}",
-            f"{all_cases_results['Worst Case']['metrics']['roi_year1']:.1f}%",
-            f"{all_cases_results['Worst Case']['metrics']['roi_3year']:.1f}%"
+    roi_columns = {'Metric': ['3-Year NPV', 'Payback (months)', 'Year 1 ROI', '3-Year ROI']}
+    for case_name in CASE_NAMES:
+        case_metrics = all_cases_results[case_name]['metrics']
+        roi_columns[case_name] = [
+            format_number(case_metrics['npv'], prefix=currency_symbol),
+            payback_value[case_name],
+            f"{case_metrics['roi_year1']:.1f}%",
+            f"{case_metrics['roi_3year']:.1f}%"
         ]
-    })
+    roi_comparison = pd.DataFrame(roi_columns)
     st.dataframe(roi_comparison, use_container_width=True, hide_index=True)
 
 # Investment breakdown
@@ -892,9 +1134,9 @@ investment_detail = pd.DataFrame({
     'Cost Category': ['Platform (Annual)', 'Implementation (One-time)', 'Change Management (One-time)', 
                      'Year 1 Total', 'Years 2-3 (Annual)'],
     selected_case: [
-        format_number(inputs['platform_annual_cost'] * case_multipliers['cost_multiplier'], prefix=currency_symbol),
-        format_number(inputs['implementation_cost'] * case_multipliers['cost_multiplier'], prefix=currency_symbol),
-        format_number(inputs['change_management'] * case_multipliers['cost_multiplier'], prefix=currency_symbol),
+        format_number(inputs.platform_annual_cost * case_multipliers['cost_multiplier'], prefix=currency_symbol),
+        format_number(inputs.implementation_cost * case_multipliers['cost_multiplier'], prefix=currency_symbol),
+        format_number(inputs.change_management * case_multipliers['cost_multiplier'], prefix=currency_symbol),
         format_number(costs['year1'], prefix=currency_symbol),
         format_number(costs['recurring'], prefix=currency_symbol)
     ]
@@ -903,30 +1145,25 @@ st.dataframe(investment_detail, use_container_width=True, hide_index=True)
 
 # Operational improvements table
 st.markdown("#### 🎯 Operational Improvements")
+# Current and target values as parallel arrays, so every improvement comes from one subtraction
+current_values = np.array([getattr(inputs, field) for _, field, _, _, _ in OPERATIONAL_METRICS])
+target_values = np.array([benefits[key] for _, _, key, _, _ in OPERATIONAL_METRICS])
+improvement_values = current_values - target_values
+value_formats = [value_format for _, _, _, value_format, _ in OPERATIONAL_METRICS]
+automation_improvement = f"+{benefits['automation_improvement']:.0f}%"
+
 improvements = pd.DataFrame({
-    'Metric': ['DSO (Days)', 'Error Rate (%)', 'Revenue Leakage (%)', 
-              'Order-to-Cash Cycle (Days)', 'Automation Rate Improvement (%)'],
+    'Metric': [label for label, _, _, _, _ in OPERATIONAL_METRICS] + ['Automation Rate Improvement (%)'],
     'Current State': [
-        f"{inputs['current_dso']:.0f}",
-        f"{inputs['current_error_rate']:.1f}%",
-        f"{inputs['current_leakage']:.1f}%",
-        f"{inputs['current_cycle_days']:.1f}",
-        "—"
-    ],
+        value_format.format(value) for value_format, value in zip(value_formats, current_values)
+    ] + ["—"],
     f'Target State ({selected_case})': [
-        f"{benefits['target_dso']:.0f}",
-        f"{benefits['target_error_rate']:.1f}%",
-        f"{benefits['target_leakage']:.1f}%",
-        f"{benefits['target_cycle_days']:.1f}",
-        f"+{benefits['automation_improvement']:.0f}%"
-    ],
+        value_format.format(value) for value_format, value in zip(value_formats, target_values)
+    ] + [automation_improvement],
     'Improvement': [
-        f"{inputs['current_dso'] - benefits['target_dso']:.0f} days",
-        f"{inputs['current_error_rate'] - benefits['target_error_rate']:.1f}%",
-        f"{inputs['current_leakage'] - benefits['target_leakage']:.1f}%",
-        f"{inputs['current_cycle_days'] - benefits['target_cycle_days']:.1f} days",
-        f"+{benefits['automation_improvement']:.0f}%"
-    ]
+        improvement_format.format(value)
+        for (_, _, _, _, improvement_format), value in zip(OPERATIONAL_METRICS, improvement_values)
+    ] + [automation_improvement]
 })
 st.dataframe(improvements, use_container_width=True, hide_index=True)
 
@@ -934,89 +1171,36 @@ st.dataframe(improvements, use_container_width=True, hide_index=True)
 st.markdown("## 📥 Export & Documentation")
 
 col1, col2 = st.columns(2)
+# Read the date once so both file names agree even if the rerun straddles midnight
+export_date = today_token()
 
 with col1:
     # Prepare CSV export with all scenarios
-    export_data = []
-    for case_name in ['Best Case', 'Base Case', 'Worst Case']:
-        case_data = all_cases_results[case_name]
-        export_data.append({
-            'Scenario': case_name,
-            'Total Annual Benefit': case_data['benefits']['total_annual'],
-            'Working Capital': case_data['benefits']['working_capital'],
-            'Error Reduction': case_data['benefits']['error_reduction'],
-            'Leakage Prevention': case_data['benefits']['leakage_prevention'],
-            'Labor Savings': case_data['benefits']['labor_savings'],
-            'Capacity Increase': case_data['benefits']['capacity_increase'],
-            'Year 1 Investment': case_data['costs']['year1'],
-            'Recurring Cost': case_data['costs']['recurring'],
-            '3-Year NPV': case_data['metrics']['npv'],
-            'Payback Months': case_data['metrics']['payback_months'],
-            '3-Year ROI': case_data['metrics']['roi_3year'],
-            'Currency': currency
-        })
-    
-    export_df = pd.DataFrame(export_data)
-    csv = export_df.to_csv(index=False)
+    csv = build_export_csv(all_cases_results, currency)
     
     st.download_button(
         label="📊 Download Full Analysis (CSV)",
         data=csv,
-        file_name=f"order_management_business_case_{datetime.now().strftime('%Y%m%d')}.csv",
+        file_name=f"order_management_business_case_{export_date}.csv",
         mime="text/csv"
     )
 
 with col2:
     # Executive summary
-    exec_summary = f"""
-ORDER MANAGEMENT AI - EXECUTIVE SUMMARY
-Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}
-Currency: {currency}
-Selected Scenario: {selected_case}
-
-KEY FINANCIAL METRICS
-Total Annual Benefit: {format_number(benefits['total_annual'], prefix=currency_symbol)}
-3-Year NPV: {format_number(roi_metrics['npv'], prefix=currency_symbol)}
-Payback Period: {roi_metrics['payback_months']:.1f} months
-3-Year ROI: {roi_metrics['roi_3year']:.1f}%
-
-BENEFIT BREAKDOWN
-Working Capital: {format_number(benefits['working_capital'], prefix=currency_symbol)}
-Error Reduction: {format_number(benefits['error_reduction'], prefix=currency_symbol)}
-Leakage Prevention: {format_number(benefits['leakage_prevention'], prefix=currency_symbol)}
-Labor Savings: {format_number(benefits['labor_savings'], prefix=currency_symbol)}
-Capacity Increase: {format_number(benefits['capacity_increase'], prefix=currency_symbol)}
-
-INVESTMENT REQUIRED
-Year 1: {format_number(costs['year1'], prefix=currency_symbol)}
-Recurring (Years 2-3): {format_number(costs['recurring'], prefix=currency_symbol)}
-
-OPERATIONAL IMPROVEMENTS
-DSO: {inputs['current_dso']:.0f} → {benefits['target_dso']:.0f} days
-Error Rate: {inputs['current_error_rate']:.1f}% → {benefits['target_error_rate']:.1f}%
-Revenue Leakage: {inputs['current_leakage']:.1f}% → {benefits['target_leakage']:.1f}%
-Order Cycle: {inputs['current_cycle_days']:.1f} → {benefits['target_cycle_days']:.1f} days
-Automation Increase: +{benefits['automation_improvement']:.0f}%
-
-SCENARIO COMPARISON
-Best Case 3-Year ROI: {all_cases_results['Best Case']['metrics']['roi_3year']:.1f}%
-Base Case 3-Year ROI: {all_cases_results['Base Case']['metrics']['roi_3year']:.1f}%
-Worst Case 3-Year ROI: {all_cases_results['Worst Case']['metrics']['roi_3year']:.1f}%
-"""
+    exec_summary = EXEC_SUMMARY_HEADER.format(
+        generated_at=datetime.now().strftime('%Y-%m-%d %H:%M')
+    ) + generate_executive_summary(
+        currency, currency_symbol, selected_case,
+        inputs, benefits, costs, roi_metrics, payback_period[selected_case], all_cases_results
+    )
     
     st.download_button(
         label="📄 Download Executive Summary",
         data=exec_summary,
-        file_name=f"executive_summary_{datetime.now().strftime('%Y%m%d')}.txt",
+        file_name=f"executive_summary_{export_date}.txt",
         mime="text/plain"
     )
 
 # Footer
 st.markdown("---")
-st.markdown("""
-<div style='text-align: center; color: #6c757d; font-size: 0.9em;'>
-<strong>Order Management AI Business Case</strong> | 
-Powered by Uniphore Business AI Cloud | 
-Built for CFO-grade financial analysis
-</div>
-""", unsafe_allow_html=True)
+st.markdown(FOOTER_HTML, unsafe_allow_html=True)